@@ -2,6 +2,7 @@
 set -e
 
 echo "🧹 Running Domain Cleaner..."
-python3 src/domain_cleaner.py
+# Override the interpreter with e.g. PYTHON=pypy3 ./run.sh
+"${PYTHON:-python3}" src/domain_cleaner.py
 
 echo "✅ Done! Check assets/output.txt"
\ No newline at end of file
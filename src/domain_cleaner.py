@@ -1,14 +1,143 @@
 import tldextract
 from pathlib import Path
+from itertools import islice
+import heapq
+from multiprocessing import Pool
+import mmap
+import os
 import re
-from urllib.parse import urlparse
+import string
 
 INPUT_FILE = Path("assets/input.txt")
 OUTPUT_FILE = Path("assets/output.txt")
+READ_CHUNK_SIZE = 1 << 22  # 4 MiB window per decode
+BATCH_SIZE = 50_000  # lines handed to a worker process at a time
+WORKERS = os.cpu_count() or 1
 
 # Lithuanian government/institutional domains and special suffixes
-GOV_DOMAINS = {"lrv", "edu", "mil"}
-GOV_SUFFIXES = {"lrv.lt", "edu.lt", "mil.lt", "gov.lt"}
+GOV_DOMAINS = frozenset({"lrv", "edu", "mil"})
+GOV_SUFFIXES = frozenset({"lrv.lt", "edu.lt", "mil.lt", "gov.lt"})
+
+# Skip reasons are small int codes in the hot path; _REASON_STR[code] is the text
+# written to errors.txt, formatted only when errors are written out
+(
+    _R_EMPTY,
+    _R_EMPTY_LINE,
+    _R_IP,
+    _R_INVALID_CHARS,
+    _R_INVALID_DOMAIN,
+    _R_NON_GOVT_SUBDOMAIN,
+    _R_NON_LT,
+) = range(7)
+_REASON_STR = (
+    "empty",
+    "empty line",
+    "ip address",
+    "invalid characters",
+    "invalid domain/suffix",
+    "non-govt subdomain",
+    "non-.lt domain",
+)
+
+_IP_RE = re.compile(r'^\d+(\.\d+){3}$')
+# Stdlib re on purpose: the third-party regex module is slower on this pattern, and its \w
+# also matches combining marks, which would make results depend on what is installed
+_VALID_CHARS_RE = re.compile(r'^[\w\-.]+$')
+# ASCII subset of _VALID_CHARS_RE, deleted via bytes.translate; anything left over is invalid
+_ASCII_VALID_CHARS = (string.ascii_letters + string.digits + '_-.').encode('ascii')
+
+# Single offline extractor built once at import; uses the bundled suffix list snapshot
+_EXTRACT = tldextract.TLDExtract(
+    suffix_list_urls=(),
+    cache_dir=None,
+    fallback_to_snapshot=True,
+    include_psl_private_domains=False,
+)
+
+def _iter_lines(path: Path):
+    """Yield lines (without the newline) from a UTF-8 text file.
+
+    Memory-maps the file and cuts it into ~READ_CHUNK_SIZE windows that end on a newline,
+    so each window decodes and splits in one pass. \\r\\n and bare \\r count as newlines,
+    same as reading the file in text mode.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = mm.rfind(b"\n", start, start + READ_CHUNK_SIZE) + 1
+                if not end:
+                    # No newline inside the window: extend it to the end of this line
+                    end = mm.find(b"\n", start + READ_CHUNK_SIZE) + 1 or size
+                chunk = mm[start:end].decode("utf-8")
+                start = end
+
+                if "\r" in chunk:
+                    chunk = chunk.replace("\r\n", "\n").replace("\r", "\n")
+                lines = chunk.split("\n")
+                if chunk.endswith("\n"):
+                    lines.pop()
+                yield from lines
+
+def _iter_batches(lines, size: int):
+    """Group lines into (first_line_number, [lines]) batches of at most `size` lines."""
+    line_number = 1
+    while True:
+        batch = list(islice(lines, size))
+        if not batch:
+            return
+        yield line_number, batch
+        line_number += len(batch)
+
+def _process_batch(batch):
+    """Worker entry point: run process_domain over one batch from _iter_batches.
+
+    Returns (lines_seen, domains, errors, processed_count) where domains is a sorted list
+    of the batch's unique domains and errors is a (line_numbers, raw_lines, reason_codes)
+    triple of parallel lists in input order.
+    """
+    first_line, lines = batch
+    domains = set()
+    # Errors as parallel lists rather than a tuple per skipped line
+    err_lines = []
+    err_texts = []
+    err_reasons = []
+    processed_count = 0
+
+    # raw line -> process_domain result, so repeated lines in a batch are parsed once;
+    # the keys are the batch's own line strings, already held in `lines`
+    seen = {}
+
+    # Bind hot-loop callables to locals to skip global/attribute lookups per line
+    process = process_domain
+    add_domain = domains.add
+    add_err_line = err_lines.append
+    add_err_text = err_texts.append
+    add_err_reason = err_reasons.append
+
+    for line_count, raw_line in enumerate(lines, first_line):
+        # Ignore empty lines entirely (do not count or log them)
+        if not raw_line.strip():
+            continue
+
+        processed_count += 1
+        result = seen.get(raw_line)
+        if result is None:
+            result = seen[raw_line] = process(raw_line)
+        domain, reason = result
+        if domain:
+            # process_domain already returns lowercase domains
+            add_domain(domain)
+        else:
+            add_err_line(line_count)
+            add_err_text(raw_line)
+            add_err_reason(reason)
+
+    # Sorting here spreads the sort across workers; the main process only merges
+    return len(lines), sorted(domains), (err_lines, err_texts, err_reasons), processed_count
 
 def clean_domains():
     if not INPUT_FILE.exists():
@@ -16,104 +145,149 @@ def clean_domains():
         return
 
     cleaned = set()
-    errors = []
+    shards = []  # sorted, mutually disjoint lists of domains; merged on output
     processed_count = 0
     skipped_count = 0
+    line_count = 0
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        line_count = 0
-        for line in f:
-            line_count += 1
-            if line_count % 1000 == 0:
-                print(f"...processed {line_count} lines...")
-
-            raw_line = line.rstrip("\n")
+    OUTPUT_FILE.parent.mkdir(exist_ok=True)
+    errors_file = Path("assets/errors.txt")
 
-            # Ignore empty lines entirely (do not count or log them)
-            if not raw_line.strip():
-                continue
+    # Errors are written to assets/errors.txt as each batch finishes instead of being
+    # kept in memory; on large mixed inputs they far outnumber the unique .lt domains.
+    # imap (not imap_unordered) keeps batches, and therefore errors, in input order.
+    with Pool(WORKERS) as pool, open(errors_file, "w", encoding="utf-8") as ef:
+        for lines_seen, domains, batch_errors, batch_processed in pool.imap(
+            _process_batch, _iter_batches(_iter_lines(INPUT_FILE), BATCH_SIZE)
+        ):
+            line_count += lines_seen
+            print(f"...processed {line_count} lines...")
 
-            processed_count += 1
-            domain, reason = process_domain(raw_line)
-            if domain:
-                cleaned.add(domain.lower())
-            else:
-                skipped_count += 1
-                errors.append((line_count, raw_line, reason))
+            # Keep only domains no earlier batch produced; this preserves the shard's order
+            fresh = [domain for domain in domains if domain not in cleaned]
+            if fresh:
+                cleaned.update(fresh)
+                shards.append(fresh)
+            processed_count += batch_processed
+            err_lines, err_texts, err_reasons = batch_errors
+            skipped_count += len(err_lines)
 
+            # Format the whole batch in one join; skip logging empty lines per request
+            ef.write("".join(
+                f"Line {line_num}: {_REASON_STR[code]} | {line_val}\n"
+                for line_num, line_val, code in zip(err_lines, err_texts, err_reasons)
+                if code != _R_EMPTY_LINE
+            ))
 
-    OUTPUT_FILE.parent.mkdir(exist_ok=True)
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        for domain in sorted(cleaned):
-            f.write(domain + "\n")
-
-    # Write errors to assets/errors.txt
-    errors_file = Path("assets/errors.txt")
-    with open(errors_file, "w", encoding="utf-8") as ef:
-        for line_num, line_val, reason in errors:
-            # Skip logging empty lines to errors file per request
-            if reason == "empty line":
-                continue
-            ef.write(f"Line {line_num}: {reason} | {line_val}\n")
+        # One joined write of the merged shards instead of a write() call per domain
+        if shards:
+            f.write("\n".join(heapq.merge(*shards)))
+            f.write("\n")
 
     print(f"✅ Cleaned {len(cleaned)} unique .lt domains saved to {OUTPUT_FILE}")
     print(f"Processed {processed_count} non-empty lines.")
     print(f"⚠️ {skipped_count} lines skipped. See {errors_file} for details.")
 
+def _split_lt(hostname: str):
+    """Split a lowercased .lt hostname into (subdomain, domain, suffix) without a suffix list lookup.
+
+    The only public suffixes under .lt are `lt` and `gov.lt`, so a right split is enough.
+    Returns None when the fast path does not apply and tldextract should decide.
+    """
+    parts = hostname.rsplit('.', 3)
+    if len(parts) < 2 or parts[-1] != 'lt':
+        return None
+    if parts[-2] == 'gov':
+        if len(parts) < 3 or not parts[-3]:
+            return None
+        return '.'.join(parts[:-3]), parts[-3], 'gov.lt'
+    if not parts[-2]:
+        return None
+    return '.'.join(parts[:-2]), parts[-2], 'lt'
+
 def process_domain(raw: str):
     """Process a single raw input line. Returns (domain, None) on success or (None, reason) on skip.
 
+    `reason` is one of the _R_* codes; _REASON_STR[reason] gives its description.
+
     Normalizes, strips trailing dots, handles URLs, removes www., skips IPs and invalid characters,
     and only returns .lt domains with government subdomain preservation rules.
     """
     if raw is None:
-        return None, "empty"
+        return None, _R_EMPTY
 
     cleaned = raw.strip()
     if not cleaned:
-        return None, "empty line"
+        return None, _R_EMPTY_LINE
 
     # Strip trailing dots
     cleaned = cleaned.rstrip('.')
 
-    # If input is a URL, extract netloc
-    if re.match(r'^[a-zA-Z]+://', cleaned):
-        parsed = urlparse(cleaned)
-        cleaned = parsed.netloc or cleaned
+    # If input is a URL (ASCII letters followed by ://), keep only the netloc
+    scheme_end = cleaned.find('://')
+    if scheme_end > 0:
+        scheme = cleaned[:scheme_end]
+        if scheme.isascii() and scheme.isalpha():
+            netloc = cleaned[scheme_end + 3:].split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+            # The host can carry its own trailing dot (http://alfa.lt./x)
+            cleaned = netloc.rstrip('.') or cleaned
 
     # Remove www. prefix if present
-    if cleaned.lower().startswith('www.'):
+    if cleaned[:4].lower() == 'www.':
         cleaned = cleaned[4:]
 
     # Skip if it's an IP address
-    if re.match(r'^\d+(\.\d+){3}$', cleaned):
-        return None, "ip address"
+    if _IP_RE.match(cleaned):
+        return None, _R_IP
 
     # Allow only valid domain characters (letters, digits, dash, dot)
-    if not re.match(r'^[\w\-.]+$', cleaned, re.UNICODE):
-        return None, "invalid characters"
+    # (ASCII input, including punycode, skips the regex engine; Unicode IDNs fall back to it)
+    if cleaned.isascii():
+        valid = cleaned and not cleaned.encode('ascii').translate(None, _ASCII_VALID_CHARS)
+    else:
+        valid = _VALID_CHARS_RE.match(cleaned)
+    if not valid:
+        return None, _R_INVALID_CHARS
 
     cleaned = cleaned.lower()
 
-    ext = tldextract.extract(cleaned)
-    if not ext.domain or not ext.suffix:
-        return None, "invalid domain/suffix"
+    # Every accepted suffix (lt, gov.lt) ends in .lt; reject the rest before any parsing
+    if not cleaned.endswith('.lt'):
+        # A single label like "notadomain" has no suffix at all
+        if '.' not in cleaned:
+            return None, _R_INVALID_DOMAIN
+        return None, _R_NON_LT
+
+    parts = _split_lt(cleaned)
+    if parts is None:
+        ext = _EXTRACT(cleaned)
+        parts = ext.subdomain, ext.domain, ext.suffix
+    subdomain, name, suffix = parts
+    if not name or not suffix:
+        return None, _R_INVALID_DOMAIN
 
-    suffix = ext.suffix
-    domain = f"{ext.domain}.{suffix}"
-    # Preserve government subdomains either by special suffixes or second-level gov domains
-    if suffix in GOV_SUFFIXES or (suffix == "lt" and ext.domain in GOV_DOMAINS):
-        if ext.subdomain:
-            domain = f"{ext.subdomain}.{domain}"
-        return domain, None
+    # `cleaned` is the full lowercased hostname, so accepted domains are returned as-is
+    # rather than rebuilt from their parts. The exception is an empty leading label
+    # (".alfa.lt"), which the split drops; rebuild only then.
+    if cleaned[0] == '.':
+        cleaned = f"{subdomain}.{name}.{suffix}" if subdomain else f"{name}.{suffix}"
 
-    # Commercial .lt: reject if subdomain exists, otherwise accept
+    # Dispatch on the common plain .lt suffix first
     if suffix == "lt":
-        if ext.subdomain:
-            return None, "non-govt subdomain"
-        return domain, None
+        # Preserve government subdomains under second-level gov domains (lrv.lt, edu.lt, mil.lt)
+        if name in GOV_DOMAINS:
+            return cleaned, None
+        # Commercial .lt: reject if subdomain exists, otherwise accept
+        if subdomain:
+            return None, _R_NON_GOVT_SUBDOMAIN
+        return cleaned, None
+
+    # Preserve government subdomains under special suffixes (gov.lt)
+    if suffix in GOV_SUFFIXES:
+        return cleaned, None
 
-    return None, "non-.lt domain"
+    return None, _R_NON_LT
 
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 from pathlib import Path
+import sys
 import tldextract
 import pytest
 import re
 from urllib.parse import urlparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+import domain_cleaner
+
 
 def process_domains_for_test(input_lines):
     """
@@ -234,3 +238,145 @@ def test_idn_domain_preservation():
     assert "xn--vilnius-9ib.lt" in output
     assert "xn--kaunas-9ib.lt" in output
     assert "xn--klaipda-9ib.lt" in output
+
+
+@pytest.mark.parametrize("hostname,expected", [
+    ("alfa.lt", ("", "alfa", "lt")),
+    ("blog.alfa.lt", ("blog", "alfa", "lt")),
+    ("a.b.c.alfa.lt", ("a.b.c", "alfa", "lt")),
+    ("lrs.lrv.lt", ("lrs", "lrv", "lt")),
+    ("services.gov.lt", ("", "services", "gov.lt")),
+    ("x.y.services.gov.lt", ("x.y", "services", "gov.lt")),
+    (".alfa.lt", ("", "alfa", "lt")),
+    # Malformed or non-.lt hostnames are left to tldextract
+    ("gov.lt", None),
+    (".gov.lt", None),
+    ("a..lt", None),
+    ("lt", None),
+    ("example.com", None),
+])
+def test_split_lt(hostname, expected):
+    """Test the .lt fast-path split, including what it defers to tldextract."""
+    assert domain_cleaner._split_lt(hostname) == expected
+
+
+@pytest.mark.parametrize("raw,expected", [
+    ("alfa.lt", ("alfa.lt", None)),
+    ("ALFA.LT.", ("alfa.lt", None)),
+    (".alfa.lt", ("alfa.lt", None)),
+    ("www..alfa.lt", ("alfa.lt", None)),
+    ("http://.alfa.lt", ("alfa.lt", None)),
+    (".lrv.lt", ("lrv.lt", None)),
+    (".x.gov.lt", ("x.gov.lt", None)),
+    ("x.gov.lt", ("x.gov.lt", None)),
+    ("portal.admin.lrv.lt", ("portal.admin.lrv.lt", None)),
+    ("gov.lt", (None, domain_cleaner._R_INVALID_DOMAIN)),
+    ("a..lt", (None, domain_cleaner._R_INVALID_DOMAIN)),
+    ("blog.alfa.lt", (None, domain_cleaner._R_NON_GOVT_SUBDOMAIN)),
+])
+def test_process_domain(raw, expected):
+    """Test process_domain on the source module, including dotted edge cases."""
+    assert domain_cleaner.process_domain(raw) == expected
+
+
+@pytest.mark.parametrize("content,expected", [
+    (b"", []),
+    (b"a.lt\nb.lt\n", ["a.lt", "b.lt"]),
+    (b"a.lt\nb.lt", ["a.lt", "b.lt"]),
+    (b"a.lt\r\nb.lt\r\n", ["a.lt", "b.lt"]),
+    (b"a.lt\rb.lt\r", ["a.lt", "b.lt"]),
+    (b"a.lt\r\r\nb.lt", ["a.lt", "", "b.lt"]),
+    (b"\n\na.lt\n\n", ["", "", "a.lt", ""]),
+    ("ąžuolas.lt\nvilnius.lt\n".encode("utf-8"), ["ąžuolas.lt", "vilnius.lt"]),
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 22])
+def test_iter_lines(tmp_path, monkeypatch, content, expected, chunk_size):
+    """Test that _iter_lines splits like text-mode iteration for any chunk size."""
+    monkeypatch.setattr(domain_cleaner, "READ_CHUNK_SIZE", chunk_size)
+    path = tmp_path / "input.txt"
+    path.write_bytes(content)
+    assert list(domain_cleaner._iter_lines(path)) == expected
+    with open(path, "r", encoding="utf-8") as f:
+        assert [line.rstrip("\n") for line in f] == expected
+
+
+def test_batch_line_numbers():
+    """Test that batches carry their first line number into reported errors."""
+    lines = ["alfa.lt", "example.com", "", "blog.alfa.lt", "beta.lt", "1.2.3.4", "gama.lt"]
+    batches = list(domain_cleaner._iter_batches(iter(lines), 3))
+    assert batches == [(1, lines[0:3]), (4, lines[3:6]), (7, lines[6:])]
+
+    results = [domain_cleaner._process_batch(batch) for batch in batches]
+    assert [lines_seen for lines_seen, _, _, _ in results] == [3, 3, 1]
+    assert [domains for _, domains, _, _ in results] == [["alfa.lt"], ["beta.lt"], ["gama.lt"]]
+    assert [errors[0] for _, _, errors, _ in results] == [[2], [4, 6], []]
+    assert [processed for _, _, _, processed in results] == [2, 3, 1]
+
+
+def test_batch_duplicate_lines():
+    """Test that repeated lines in a batch are each counted and logged."""
+    lines = ["example.com", "alfa.lt", "example.com", "ALFA.LT", "example.com"]
+    _, domains, (err_lines, err_texts, err_reasons), processed = \
+        domain_cleaner._process_batch((10, lines))
+    assert domains == ["alfa.lt"]
+    assert err_lines == [10, 12, 14]
+    assert err_texts == ["example.com"] * 3
+    assert err_reasons == [domain_cleaner._R_NON_LT] * 3
+    assert processed == 5
+
+
+def test_clean_domains(tmp_path, monkeypatch, capsys):
+    """Test the full run: cross-batch dedup, merged sorted output and ordered errors."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(domain_cleaner, "BATCH_SIZE", 2)
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "input.txt").write_text(
+        "beta.lt\nexample.com\nalfa.lt\nBETA.LT\n192.168.1.1\nalfa.lt\nlrs.lrv.lt\n\nbeta.lt\n",
+        encoding="utf-8",
+    )
+
+    domain_cleaner.clean_domains()
+
+    output = (tmp_path / "assets" / "output.txt").read_text(encoding="utf-8")
+    assert output == "alfa.lt\nbeta.lt\nlrs.lrv.lt\n"
+    errors = (tmp_path / "assets" / "errors.txt").read_text(encoding="utf-8")
+    assert errors.splitlines() == [
+        "Line 2: non-.lt domain | example.com",
+        "Line 5: ip address | 192.168.1.1",
+    ]
+    assert "Processed 8 non-empty lines." in capsys.readouterr().out
+
+
+def test_url_host_trailing_dot():
+    """Test that a trailing dot on a URL's host is stripped before the .lt check."""
+    assert domain_cleaner.process_domain("http://alfa.lt./x") == ("alfa.lt", None)
+    assert domain_cleaner.process_domain("http://www.alfa.lt./") == ("alfa.lt", None)
+    assert domain_cleaner.process_domain("https://portal.lrv.lt../") == ("portal.lrv.lt", None)
+
+
+def test_non_lt_rejection():
+    """Test that non-.lt hostnames are rejected before any suffix parsing."""
+    assert domain_cleaner.process_domain("example.com") == (None, domain_cleaner._R_NON_LT)
+    assert domain_cleaner.process_domain("alfa.lt.com") == (None, domain_cleaner._R_NON_LT)
+    assert domain_cleaner.process_domain("notadomain") == (None, domain_cleaner._R_INVALID_DOMAIN)
+
+
+@pytest.mark.parametrize("raw,code", [
+    (None, domain_cleaner._R_EMPTY),
+    ("", domain_cleaner._R_EMPTY_LINE),
+    ("192.168.1.1", domain_cleaner._R_IP),
+    ("test!@#.lt", domain_cleaner._R_INVALID_CHARS),
+    ("notadomain", domain_cleaner._R_INVALID_DOMAIN),
+    ("blog.alfa.lt", domain_cleaner._R_NON_GOVT_SUBDOMAIN),
+    ("example.com", domain_cleaner._R_NON_LT),
+])
+def test_reason_codes(raw, code):
+    """Test that each skip path returns its int reason code."""
+    assert domain_cleaner.process_domain(raw) == (None, code)
+
+
+def test_reason_strings():
+    """Test that every reason code maps to its errors.txt description."""
+    assert domain_cleaner._REASON_STR[domain_cleaner._R_NON_LT] == "non-.lt domain"
+    assert domain_cleaner._REASON_STR[domain_cleaner._R_NON_GOVT_SUBDOMAIN] == "non-govt subdomain"
+    assert len(domain_cleaner._REASON_STR) == domain_cleaner._R_NON_LT + 1